@@ -7,6 +7,8 @@
 """
 import os
 import logging
+from functools import lru_cache
+from typing import Any
 from dotenv import dotenv_values
 from . import paths as PATHS
 from . import urls as URLS
@@ -17,25 +19,86 @@ from . import streamlit_frontend_config
 """
 Environment file
 """
-ENV = dotenv_values(os.path.join(PATHS.PACKAGE_PATH, ".env"))
+
+
+@lru_cache(maxsize=1)
+def get_env() -> dict:
+    """
+    Function for loading the environment file.
+    The file is read and parsed only once per process.
+    :return: Environment dictionary.
+    """
+    return dotenv_values(os.path.join(PATHS.PACKAGE_PATH, ".env"))
+
+
+ENV = get_env()
 
 
 """
 Logger
 """
-LOGGER = logging.Logger("LLMTutor")
+LOGGER = logging.getLogger("LLMTutor")
+LOGGER.setLevel(ENV.get("LOGLEVEL", "INFO").upper())
+if not LOGGER.handlers:
+    _LOGGING_HANDLER = logging.StreamHandler()
+    _LOGGING_HANDLER.setFormatter(logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+    LOGGER.addHandler(_LOGGING_HANDLER)
 
 
 """
 Backends
 """
 BACKEND_HOST = ENV.get("BACKEND_HOST", "127.0.0.1")
-BACKEND_PORT = ENV.get("BACKEND_PORT", "7861")
+BACKEND_PORT = int(ENV.get("BACKEND_PORT", "7861"))
+
+
+"""
+Language models
+"""
+MODEL_QUANT = ENV.get("MODEL_QUANT", "Q4_K_M")
+LLAMACPP_USE_MMAP = ENV.get("LLAMACPP_USE_MMAP", "True").lower() == "true"
+LLAMACPP_USE_MLOCK = ENV.get("LLAMACPP_USE_MLOCK", "False").lower() == "true"
+LLAMACPP_N_GPU_LAYERS = int(
+    ENV["LLAMACPP_N_GPU_LAYERS"]) if ENV.get("LLAMACPP_N_GPU_LAYERS") else None
+
+
+"""
+Embedding models
+"""
+# Torch thread counts for embedding, kept low so embedding does not oversubscribe cores shared with llama.cpp workers.
+# Torch thread pools are process-global, so these are not applied while a transformers LLM is loaded
+# and loading a transformers LLM restores the previous intra-op thread count.
+EMBEDDING_THREADS = int(ENV.get("EMBEDDING_THREADS", "4"))
+EMBEDDING_INTEROP_THREADS = int(ENV.get("EMBEDDING_INTEROP_THREADS", "1"))
+
+
+"""
+Knowledgebases
+"""
+# Document loading workers, processes suit CPU-bound loaders, threads suit IO-bound loaders and spinning disks
+DOCUMENT_LOADING_WORKERS = int(
+    ENV["DOCUMENT_LOADING_WORKERS"]) if ENV.get("DOCUMENT_LOADING_WORKERS") else None
+DOCUMENT_LOADING_PROCESSES = ENV.get(
+    "DOCUMENT_LOADING_PROCESSES", "False").lower() == "true"
 
 
 """
 Frontends
 """
-FLASK_CONFIG = flask_frontend_config.global_config
-STREAMLIT_CONFIG = streamlit_frontend_config.CONFIG
-FLASK_CONFIG["streamlit_port"] = str(STREAMLIT_CONFIG["server"]["port"])
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Module attribute getter for resolving frontend configurations on every access.
+    Keeps the Streamlit TOML file from being parsed by processes which never use it
+    and picks up changes to it.
+    :param name: Attribute name.
+    :return: Attribute value.
+    """
+    if name == "STREAMLIT_CONFIG":
+        return streamlit_frontend_config.load_config()
+    elif name == "FLASK_CONFIG":
+        return flask_frontend_config.build_flask_config(
+            streamlit_frontend_config.load_config()["server"]["port"])
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -5,7 +5,7 @@
 *            (c) 2023 Alexander Hering             *
 ****************************************************
 """
-global_config = {
+page_config = {
     "page_title": "LLM Tutor",
     "page_icon_path": "img/icons/favicon.ico"
 }
@@ -126,5 +126,14 @@ menu_config = {
     }
 }
 
-for dictionary in [endpoint_config, menu_config, integration_config]:
-    global_config.update(dictionary)
+global_config = {**page_config, **endpoint_config,
+                 **menu_config, **integration_config}
+
+
+def build_flask_config(streamlit_port: int) -> dict:
+    """
+    Function for building a Flask app config without mutating the shared global config.
+    :param streamlit_port: Port of the integrated Streamlit app.
+    :return: Flask app config.
+    """
+    return {**global_config, "streamlit_port": str(streamlit_port)}
@@ -10,8 +10,8 @@ import os
 """
 Base 
 """
-PACKAGE_PATH = os.path.abspath(os.path.dirname(os.path.dirname(
-    os.path.dirname(__file__))))
+PACKAGE_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", ".."))
 SOURCE_PATH = os.path.join(PACKAGE_PATH, "src")
 DOCS_PATH = os.path.join(PACKAGE_PATH, "docs")
 SUBMODULE_PATH = os.path.join(SOURCE_PATH, "submodules")
@@ -23,12 +23,14 @@ DUMP_PATH = os.path.join(DATA_PATH, "processes", "dumps")
 """
 Machine Learning Models
 """
+MACHINE_LEARNING_MODEL_PATH = os.path.join(
+    PACKAGE_PATH, "machine_learning_models")
 TEXTGENERATION_MODEL_PATH = os.path.join(
-    PACKAGE_PATH, "machine_learning_models", "MODELS")
+    MACHINE_LEARNING_MODEL_PATH, "MODELS")
 TEXTGENERATION_LORA_PATH = os.path.join(
-    PACKAGE_PATH, "machine_learning_models", "LORAS")
+    MACHINE_LEARNING_MODEL_PATH, "LORAS")
 EMBEDDING_MODEL_PATH = os.path.join(
-    PACKAGE_PATH, "machine_learning_models", "EMBEDDING_MODELS")
+    MACHINE_LEARNING_MODEL_PATH, "EMBEDDING_MODELS")
 E5_LARGE_V3_PATH = os.path.join(
     EMBEDDING_MODEL_PATH, "intfloat_e5-large-v2")
 INSTRUCT_XL_PATH = os.path.join(
@@ -45,7 +47,6 @@ CONFIG_PATH = os.path.join(BACKEND_PATH, "configs")
 """
 Frontends
 """
-FLASK_COMMON_STATIC = os.path.join(
-    SOURCE_PATH, "view", "flask_frontend", "common_static")
-FLASK_COMMON_TEMPLATES = os.path.join(
-    SOURCE_PATH, "view", "flask_frontend", "common_templates")
+FLASK_FRONTEND_PATH = os.path.join(SOURCE_PATH, "view", "flask_frontend")
+FLASK_COMMON_STATIC = os.path.join(FLASK_FRONTEND_PATH, "common_static")
+FLASK_COMMON_TEMPLATES = os.path.join(FLASK_FRONTEND_PATH, "common_templates")
@@ -6,8 +6,49 @@
 ****************************************************
 """
 import os
-import toml
+from functools import lru_cache
+from typing import Any
+from . import paths as PATHS
 
-TOML_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(
-    os.path.dirname(__file__))), "config.toml"))
-CONFIG = toml.load(TOML_PATH)
+TOML_PATH = os.path.join(PATHS.PACKAGE_PATH, "config.toml")
+
+
+def load_config() -> dict:
+    """
+    Function for loading the Streamlit configuration.
+    The parsed configuration is reused as long as the TOML file is unchanged.
+    :return: Streamlit configuration.
+    """
+    stat = os.stat(TOML_PATH)
+    return parse_config(TOML_PATH, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=1)
+def parse_config(toml_path: str, modification_time: int, file_size: int) -> dict:
+    """
+    Function for parsing a TOML configuration file.
+    Prefers the standard library TOML parser where available (Python 3.11+).
+    :param toml_path: TOML file path.
+    :param modification_time: Modification time of the file in nanoseconds, used as cache key.
+    :param file_size: File size in bytes, used as cache key.
+    :return: Parsed configuration.
+    """
+    try:
+        import tomllib
+        with open(toml_path, "rb") as toml_file:
+            return tomllib.load(toml_file)
+    except ImportError:
+        import toml
+        return toml.load(toml_path)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Module attribute getter for resolving the configuration on every access.
+    The configuration is not stored as module attribute, so that changes to the TOML file are picked up.
+    :param name: Attribute name.
+    :return: Attribute value.
+    """
+    if name == "CONFIG":
+        return load_config()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
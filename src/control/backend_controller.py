@@ -7,26 +7,66 @@
 """
 import os
 from uuid import uuid4
-from queue import Queue
+from collections import OrderedDict
+from queue import Queue, Empty
 from threading import Thread, Event
+from time import monotonic
 from typing import Optional, Any, List
+from sqlalchemy import select, exists, insert, update, inspect
+from sqlalchemy.orm import selectinload
 from src.configuration import configuration as cfg
-from src.utility.silver.language_model_utility import spawn_language_model_instance
-from src.model.backend_control.dataclasses import create_or_load_database
+from src.utility.bronze import uuid_utility
 
 
-def run_llm(main_switch: Event, current_switch: Event, llm_configuraiton: dict, input_queue: Queue, output_queue: Queue) -> None:
+def drain_queue(queue: Queue, max_batch: int = 8, timeout: float = 0.5, max_wait: float = 0.02) -> List[Any]:
+    """
+    Function for collecting a batch of queue entries.
+    :param queue: Queue to drain.
+    :param max_batch: Maximum batch size. Defaults to 8.
+    :param timeout: Time in seconds to wait for a first entry. Defaults to 0.5.
+    :param max_wait: Time in seconds to wait for further entries after the first one arrived. Defaults to 0.02.
+    :return: List of queue entries in queue order. Empty, if no entry arrived in time.
+    """
+    try:
+        batch = [queue.get(timeout=timeout)]
+    except Empty:
+        return []
+    deadline = monotonic() + max_wait
+    while len(batch) < max_batch:
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(queue.get(timeout=remaining))
+        except Empty:
+            break
+    return batch
+
+
+def run_llm(main_switch: Event, current_switch: Event, running_flag: Event, llm_configuraiton: dict, input_queue: Queue, output_queue: Queue) -> None:
     """
     Function for running LLM instance.
     :param main_switch: Pool killswitch event.
     :param current_switch: Sepecific killswitch event.
+    :param running_flag: Event, which is set while the LLM instance is running.
     :param llm_configuration: Configuration to instantiate LLM.
     :param input_queue: Input queue.
     :param output_queue: Output queue.
     """
-    llm = spawn_language_model_instance(llm_configuraiton)
-    while not main_switch.wait(0.5) or current_switch(0.5):
-        output_queue.put(llm.handle_query(input_queue.get()))
+    # Imported lazily to keep model backends off the module import path
+    from src.utility.silver.language_model_utility import spawn_language_model_instance
+    try:
+        llm = spawn_language_model_instance(llm_configuraiton)
+        running_flag.set()
+        while not main_switch.is_set() and not current_switch.is_set():
+            # None entries are only put to wake up the thread after a killswitch was set
+            queries = [query for query in drain_queue(
+                input_queue) if query is not None]
+            if queries:
+                for response in llm.handle_query_batch(queries):
+                    output_queue.put(response)
+    finally:
+        running_flag.clear()
 
 
 class LLMPool(object):
@@ -45,11 +85,29 @@ class LLMPool(object):
         self.main_switch = Event()
         self.threads = {}
 
-    def kill_all(self) -> None:
+    def kill_all(self, wait: bool = False, timeout: float = None) -> bool:
         """
         Method for killing threads.
+        :param wait: Flag for declaring whether to block until all running threads have stopped.
+            Defaults to False.
+        :param timeout: Maximum total time in seconds to wait for threads to stop.
+            Defaults to None in which case waiting is not limited.
+        :return: True, if all threads stopped or waiting was not requested, else False.
         """
         self.main_switch.set()
+        for target_thread in self.threads:
+            self.threads[target_thread]["input"].put(None)
+        if wait:
+            deadline = None if timeout is None else monotonic() + timeout
+            for target_thread in self.threads:
+                if "thread" in self.threads[target_thread]:
+                    self.threads[target_thread]["thread"].join(
+                        None if deadline is None else max(deadline - monotonic(), 0))
+                    if self.threads[target_thread]["thread"].is_alive():
+                        cfg.LOGGER.warning(
+                            "[LLMPool] Thread %s did not stop in time", target_thread)
+                        return False
+        return True
 
     def kill(self, target_thread: str) -> None:
         """
@@ -57,6 +115,15 @@ class LLMPool(object):
         :param target_thread: Thread to kill.
         """
         self.threads[target_thread]["switch"].set()
+        self.threads[target_thread]["input"].put(None)
+
+    def is_running(self, target_thread: str) -> bool:
+        """
+        Method for checking whether a thread is running.
+        :param target_thread: Thread to check.
+        :return: True, if thread is running, else False.
+        """
+        return "running" in self.threads[target_thread] and self.threads[target_thread]["running"].is_set()
 
     def validate_resources(self, llm_configuration: dict, queue_spawns: bool) -> bool:
         """
@@ -75,7 +142,7 @@ class LLMPool(object):
         :param llm_configuration: LLM configuration.
         :return: Thread UUID.
         """
-        uuid = uuid4()
+        uuid = uuid4().hex
         self.threads[uuid] = {
             "input": Queue(),
             "output": Queue(),
@@ -89,23 +156,27 @@ class LLMPool(object):
         :param target_thread: Thread to start.
         """
         self.threads[target_thread]["switch"] = Event()
+        self.threads[target_thread]["running"] = Event()
         self.threads[target_thread]["thread"] = Thread(
             target=run_llm,
             args=(
                 self.main_switch,
                 self.threads[target_thread]["switch"],
+                self.threads[target_thread]["running"],
                 self.threads[target_thread]["config"],
                 self.threads[target_thread]["input"],
                 self.threads[target_thread]["output"],
-            )
-        ).start()
+            ),
+            daemon=True
+        )
+        self.threads[target_thread]["thread"].start()
 
     def unload_llm(self, target_thread: str) -> None:
         """
         Method for unloading LLM.
         :param target_thread: Thread to stop.
         """
-        self.threads[target_thread]["switch"].set()
+        self.kill(target_thread)
         self.threads[target_thread]["thread"].join()
 
     def query(self, target_thread: str, query: str) -> Optional[Any]:
@@ -134,25 +205,95 @@ class BackendController(object):
             os.makedirs(self.working_directory)
         self.database_uri = cfg.ENV.get(
             "BACKEND_DATABASE", f"sqlite:///{self.working_directory}/backend.db")
-        representation = create_or_load_database(self.database_uri)
-        self.base = representation["base"]
-        self.engine = representation["engine"]
-        self.model = representation["model"]
-        self.session_factory = representation["session_factory"]
+        self._representation = None
+        self.object_cache_size = 1024
+        self._object_cache = OrderedDict()
+
+    @property
+    def representation(self) -> dict:
+        """
+        Property for accessing the database representation.
+        Database reflection is deferred until first access to keep it off the construction path.
+        :return: Dictionary containing base, engine, model and session factory.
+        """
+        if self._representation is None:
+            from src.model.backend_control.dataclasses import create_or_load_database
+            self._representation = create_or_load_database(self.database_uri)
+        return self._representation
+
+    @property
+    def base(self) -> Any:
+        """
+        Property for accessing the database base.
+        :return: Database base.
+        """
+        return self.representation["base"]
+
+    @property
+    def engine(self) -> Any:
+        """
+        Property for accessing the database engine.
+        :return: Database engine.
+        """
+        return self.representation["engine"]
+
+    @property
+    def model(self) -> dict:
+        """
+        Property for accessing the database model.
+        :return: Dictionary, mapping table names to classes.
+        """
+        return self.representation["model"]
+
+    @property
+    def session_factory(self) -> Any:
+        """
+        Property for accessing the session factory.
+        :return: Session factory.
+        """
+        return self.representation["session_factory"]
+
+    @staticmethod
+    def _has_valid_uuids(object_attributes: dict) -> bool:
+        """
+        Internal method for checking whether all UUID attributes of an object can be bound as binary UUIDs.
+        UUID attributes are detected by the name "uuid" or the suffix "_uuid".
+        :param object_attributes: Object attributes.
+        :return: True, if all given UUID attributes are well-formed, else False.
+        """
+        return all(uuid_utility.parse_uuid(value) is not None for key, value in object_attributes.items()
+                   if (key == "uuid" or key.endswith("_uuid")) and value is not None)
 
     def shutdown(self) -> None:
         """
         Method for running shutdown process.
         """
-        pass
+        if self._representation is not None:
+            self._representation["session_factory"].remove()
+            self._representation["engine"].dispose()
 
-    def get_objects(self, object_type: str) -> List[Any]:
+    def get_objects(self, object_type: str, eager_relationships: List[str] = None) -> List[Any]:
         """
         Method for acquiring objects.
         :param object_type: Target object type.
+        :param eager_relationships: Relationships to load alongside the objects with one additional query each.
+            Defaults to None in which case relationships are not loaded.
+            Names, which are not mapped as relationships of the object type, are skipped.
         :return: List of objects of given type.
         """
-        return self.session_factory().query(self.model[object_type]).all()
+        model = self.model[object_type]
+        statement = select(model)
+        if eager_relationships:
+            relationships = inspect(model).relationships
+            for relationship in eager_relationships:
+                if relationship in relationships:
+                    statement = statement.options(
+                        selectinload(relationships[relationship].class_attribute))
+                else:
+                    cfg.LOGGER.warning(
+                        "[BackendController] %s has no relationship %s to load", object_type, relationship)
+        with self.session_factory() as session:
+            return session.scalars(statement).all()
 
     def get_object(self, object_type: str, object_uuid: str) -> Optional[Any]:
         """
@@ -161,9 +302,37 @@ class BackendController(object):
         :param object_uuid: Target UUID.
         :return: An object of given type and UUID, if found.
         """
-        return self.session_factory().query(self.model[object_type]).filter(
-            self.model[object_type].uuid == object_uuid
-        ).first()
+        uuid_bytes = uuid_utility.parse_uuid(object_uuid)
+        if uuid_bytes is None:
+            return None
+        # Cached under the UUID bytes, as different notations of a UUID address the same row
+        obj = self._object_cache.get((object_type, uuid_bytes))
+        if obj is None:
+            with self.session_factory() as session:
+                obj = session.get(self.model[object_type], object_uuid)
+            if obj is not None:
+                self._object_cache[(object_type, uuid_bytes)] = obj
+                if len(self._object_cache) > self.object_cache_size:
+                    self._object_cache.popitem(last=False)
+        else:
+            self._object_cache.move_to_end((object_type, uuid_bytes))
+        return obj
+
+    def object_exists(self, object_type: str, object_uuid: str) -> bool:
+        """
+        Method for checking whether an object exists without loading it.
+        :param object_type: Target object type.
+        :param object_uuid: Target UUID.
+        :return: True, if an object of given type and UUID exists, else False.
+        """
+        uuid_bytes = uuid_utility.parse_uuid(object_uuid)
+        if uuid_bytes is None:
+            return False
+        if (object_type, uuid_bytes) in self._object_cache:
+            return True
+        with self.session_factory() as session:
+            return session.execute(select(exists().where(
+                self.model[object_type].uuid == object_uuid))).scalar()
 
     def post_object(self, object_type: str, **object_attributes: Optional[Any]) -> Optional[str]:
         """
@@ -173,13 +342,34 @@ class BackendController(object):
         :return: Object UUID of added object, if adding was successful.
         """
         if "uuid" not in object_attributes:
-            object_attributes["uuid"] = str(uuid4())
+            object_attributes["uuid"] = uuid_utility.get_time_ordered_uuid()
+        if not self._has_valid_uuids(object_attributes):
+            return None
         obj = self.model[object_type](**object_attributes)
         with self.session_factory() as session:
             session.add(obj)
             session.commit()
-            session.refresh(obj)
-        return obj.uuid
+        return object_attributes["uuid"]
+
+    def post_objects(self, object_type: str, object_attribute_list: List[dict]) -> List[str]:
+        """
+        Method for adding multiple objects in a single transaction.
+        :param object_type: Target object type.
+        :param object_attribute_list: List of object attribute dictionaries.
+            Objects with malformed UUID attributes are skipped.
+        :return: Object UUIDs of added objects.
+        """
+        object_attribute_list = [object_attributes if "uuid" in object_attributes else dict(
+            object_attributes, uuid=uuid_utility.get_time_ordered_uuid()) for object_attributes in object_attribute_list]
+        object_attribute_list = [
+            object_attributes for object_attributes in object_attribute_list if self._has_valid_uuids(object_attributes)]
+        if not object_attribute_list:
+            return []
+        with self.session_factory() as session:
+            session.execute(
+                insert(self.model[object_type]), object_attribute_list)
+            session.commit()
+        return [object_attributes["uuid"] for object_attributes in object_attribute_list]
 
     def patch_object(self, object_type: str, object_uuid: str, **object_attributes: Optional[Any]) -> Optional[str]:
         """
@@ -189,17 +379,45 @@ class BackendController(object):
         :param object_attributes: Object attributes.
         :return: Object UUID of patched object, if patching was successful.
         """
-        result = None
+        uuid_bytes = uuid_utility.parse_uuid(object_uuid)
+        if uuid_bytes is None or not self._has_valid_uuids(object_attributes):
+            return None
+        self._object_cache.pop((object_type, uuid_bytes), None)
         with self.session_factory() as session:
-            obj = session.query(self.model[object_type]).filter(
-                self.model[object_type].uuid == object_uuid
-            ).first()
-            if obj:
-                for attribute in object_attributes:
-                    setattr(obj, attribute, object_attributes[attribute])
+            result = session.execute(update(self.model[object_type]).where(
+                self.model[object_type].uuid == object_uuid).values(**object_attributes).execution_options(synchronize_session=False))
+            session.commit()
+        return object_uuid if result.rowcount else None
+
+    def patch_objects(self, object_type: str, object_attribute_list: List[dict]) -> List[str]:
+        """
+        Method for patching multiple objects in a single transaction.
+        :param object_type: Target object type.
+        :param object_attribute_list: List of object attribute dictionaries, each including the target UUID.
+            Entries with malformed or unknown UUIDs are skipped, entries for the same object are merged.
+        :return: Object UUIDs of patched objects.
+        """
+        patches = {}
+        for object_attributes in object_attribute_list:
+            uuid_bytes = uuid_utility.parse_uuid(object_attributes.get("uuid"))
+            if uuid_bytes is not None and self._has_valid_uuids(object_attributes):
+                patches[uuid_bytes] = {
+                    **patches.get(uuid_bytes, {}), **object_attributes}
+        if not patches:
+            return []
+        model = self.model[object_type]
+        with self.session_factory() as session:
+            # Bulk updates by primary key fail as a whole for unknown keys, which are therefore filtered up-front
+            known_uuids = {uuid_utility.parse_uuid(object_uuid) for object_uuid in session.scalars(
+                select(model.uuid).where(model.uuid.in_(list(patches))))}
+            patches = [patches[uuid_bytes]
+                       for uuid_bytes in patches if uuid_bytes in known_uuids]
+            for uuid_bytes in known_uuids:
+                self._object_cache.pop((object_type, uuid_bytes), None)
+            if patches:
+                session.execute(update(model), patches)
                 session.commit()
-                result = obj.uuid
-        return result
+        return [object_attributes["uuid"] for object_attributes in patches]
 
     def delete_object(self, object_type: str, object_uuid: str) -> Optional[str]:
         """
@@ -210,12 +428,14 @@ class BackendController(object):
         :return: Object UUID of patched object, if deletion was successful.
         """
         result = None
+        uuid_bytes = uuid_utility.parse_uuid(object_uuid)
+        if uuid_bytes is None:
+            return result
+        self._object_cache.pop((object_type, uuid_bytes), None)
         with self.session_factory() as session:
-            obj = session.query(self.model[object_type]).filter(
-                self.model[object_type].uuid == object_uuid
-            ).first()
+            obj = session.get(self.model[object_type], object_uuid)
             if obj:
-                obj.delete()
+                session.delete(obj)
                 session.commit()
-                result = obj.uuid
+                result = object_uuid
         return result
@@ -6,6 +6,9 @@
 ****************************************************
 """
 import os
+import atexit
+import weakref
+from threading import RLock, Timer
 from typing import Any, List
 from chromadb.api.types import EmbeddingFunction, Embeddings, Documents
 from chromadb.config import Settings
@@ -13,33 +16,57 @@ from langchain.docstore.document import Document
 from langchain.vectorstores import Chroma
 from langchain.vectorstores.base import VectorStoreRetriever
 from src.configuration import configuration as cfg
-from src.utility.bronze.hashing_utility import hash_text_with_sha256
+from src.utility.bronze.hashing_utility import hash_texts_with_sha256
 from src.model.knowledgebase_control.abstract_knowledgebase_controller import KnowledgeBaseController
 from src.utility.silver import embedding_utility
 
 
+# Instances with potentially pending changes, flushed once at interpreter exit
+_INSTANCES = weakref.WeakSet()
+
+
+def _flush_all() -> None:
+    """
+    Function for persisting pending changes of all living knowledgebase instances.
+    """
+    for instance in list(_INSTANCES):
+        instance.flush()
+
+
+atexit.register(_flush_all)
+
+
 class ChromaKnowledgeBase(KnowledgeBaseController):
     """
     Class for handling knowledge base interaction with ChromaDB.
     """
 
-    def __init__(self, peristant_directory: str, metadata: dict = None, base_embedding_function: EmbeddingFunction = None) -> None:
+    def __init__(self, peristant_directory: str, metadata: dict = None, base_embedding_function: EmbeddingFunction = None, persist_interval: float = 5.0) -> None:
         """
         Initiation method.
         :param peristant_directory: Persistant directory for ChromaDB data.
         :param metadata: Embedding collection metadata. Defaults to None.
         :param base_embedding_function: Embedding function for base collection. Defaults to T5 large.
+        :param persist_interval: Maximum time in seconds, changes stay unpersisted after embedding or deleting.
+            Changes within this interval are persisted together by a background timer. Defaults to 5.0.
         """
         if not os.path.exists(peristant_directory):
             os.makedirs(peristant_directory)
         self.peristant_directory = peristant_directory
-        self.base_embedding_function = embedding_utility.LocalHuggingFaceEmbeddings(
+        self.base_embedding_function = embedding_utility.get_shared_embeddings(
             cfg.PATHS.INSTRUCT_XL_PATH
         ) if base_embedding_function is None else base_embedding_function
         self.client_settings = Settings(persist_directory=peristant_directory,
                                         chroma_db_impl='duckdb+parquet')
 
+        self.persist_interval = persist_interval
+        self._pending_persist = set()
+        self._persist_lock = RLock()
+        self._persist_timer = None
+        _INSTANCES.add(self)
+
         self.databases = {}
+        self._counts = {}
         self.base_chromadb = self.get_or_create_collection("base")
 
     # Override
@@ -62,21 +89,48 @@ class ChromaKnowledgeBase(KnowledgeBaseController):
         return self.databases[name]
 
     # Override
-    def get_retriever(self, name: str, search_type: str = "similarity", search_kwargs: dict = {"k": 4, "include_metadata": True}) -> VectorStoreRetriever:
+    def get_retriever(self, name: str, search_type: str = "similarity", search_kwargs: dict = None) -> VectorStoreRetriever:
         """
         Method for acquiring a retriever.
         :param name: Collection to use.
         :param search_type: The retriever's search type. Defaults to "similarity".
-        :param search_kwargs: The retrievery search keyword arguments. Defaults to {"k": 4, "include_metadata": True}.
+        :param search_kwargs: The retrievery search keyword arguments.
+            Defaults to None in which case {"k": 4, "include_metadata": True} is used.
         :return: Retriever instance.
         """
-        db = self.databases.get(name, self.databases["base"])
-        search_kwargs["k"] = min(
-            search_kwargs["k"], len(db.get()["ids"]))
+        name = name if name in self.databases else "base"
+        if name not in self._counts:
+            self._counts[name] = self.databases[name]._collection.count()
+        search_kwargs = {"k": 4, "include_metadata": True} if search_kwargs is None else dict(
+            search_kwargs)
+        search_kwargs["k"] = min(search_kwargs["k"], self._counts[name])
+        db = self.databases[name]
         return db.as_retriever(
             search_type=search_type, search_kwargs=search_kwargs
         )
 
+    # Override
+    def search_batch(self, name: str, queries: List[str], k: int = 4) -> List[List[Document]]:
+        """
+        Method for searching documents for multiple queries at once.
+        Queries are embedded as queries in one batch and matched with a single collection query.
+        :param name: Collection to use.
+        :param queries: Queries to search documents for.
+        :param k: Maximum number of documents per query. Defaults to 4.
+        :return: List of the most similar documents per query in query order.
+        """
+        name = name if name in self.databases else "base"
+        if name not in self._counts:
+            self._counts[name] = self.databases[name]._collection.count()
+        k = min(k, self._counts[name])
+        if not queries or k < 1:
+            return [[] for _ in queries]
+        db = self.databases[name]
+        result = db._collection.query(query_embeddings=embedding_utility.embed_queries(db._embedding_function, queries),
+                                      n_results=k, include=["documents", "metadatas"])
+        return [[Document(page_content=document, metadata=metadata or {}) for document, metadata in zip(documents, metadatas)]
+                for documents, metadatas in zip(result["documents"], result["metadatas"])]
+
     # Override
     def embed_documents(self, name: str, documents: List[Document], ids: List[str] = None) -> None:
         """
@@ -84,7 +138,57 @@ class ChromaKnowledgeBase(KnowledgeBaseController):
         :param name: Collection to use.
         :param documents: Documents to embed.
         :param ids: Custom IDs to add. Defaults to the hash of the document contents.
+            Documents with IDs, which are already stored in the collection, are not embedded again.
+        """
+        if ids is None:
+            ids = hash_texts_with_sha256(
+                [document.page_content for document in documents])
+        known_ids = set(self.databases[name]._collection.get(
+            ids=ids, include=[])["ids"])
+        new_documents = {}
+        for document_id, document in zip(ids, documents):
+            if document_id not in known_ids and document_id not in new_documents:
+                new_documents[document_id] = document
+        if new_documents:
+            # Persisting from the timer thread must not interleave with writes to the collection
+            with self._persist_lock:
+                self.databases[name].add_documents(documents=list(
+                    new_documents.values()), ids=list(new_documents))
+                self._counts.pop(name, None)
+                self._schedule_persist(name)
+
+    def delete_documents(self, name: str, ids: List[str]) -> None:
+        """
+        Method for deleting documents.
+        :param name: Collection to use.
+        :param ids: IDs of the documents to delete.
+        """
+        if ids:
+            with self._persist_lock:
+                self.databases[name]._collection.delete(ids=ids)
+                self._counts.pop(name, None)
+                self._schedule_persist(name)
+
+    def _schedule_persist(self, name: str) -> None:
+        """
+        Internal method for marking a collection as changed and scheduling its persistence.
+        :param name: Changed collection.
+        """
+        with self._persist_lock:
+            self._pending_persist.add(name)
+            if self._persist_timer is None:
+                self._persist_timer = Timer(self.persist_interval, self.flush)
+                self._persist_timer.daemon = True
+                self._persist_timer.start()
+
+    def flush(self) -> None:
+        """
+        Method for persisting all collections with pending changes.
         """
-        self.databases[name].add_documents(documents=documents, ids=[
-            hash_text_with_sha256(document.page_content) for document in documents] if ids is None else ids)
-        self.databases[name].persist()
+        with self._persist_lock:
+            if self._persist_timer is not None:
+                self._persist_timer.cancel()
+                self._persist_timer = None
+            for name in list(self._pending_persist):
+                self.databases[name].persist()
+                self._pending_persist.discard(name)
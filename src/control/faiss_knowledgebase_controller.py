@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+****************************************************
+*                    LLM Tutor                     *
+*            (c) 2023 Alexander Hering             *
+****************************************************
+"""
+import os
+import faiss
+import numpy as np
+from typing import List
+from chromadb.api.types import EmbeddingFunction
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.vectorstores import FAISS
+from langchain.vectorstores.base import VectorStoreRetriever
+from src.configuration import configuration as cfg
+from src.utility.bronze.hashing_utility import hash_texts_with_sha256
+from src.model.knowledgebase_control.abstract_knowledgebase_controller import KnowledgeBaseController
+from src.utility.silver import embedding_utility
+
+
+# Number of embeddings a quantized collection holds in a flat index before the quantizer is trained on them
+QUANTIZATION_TRAINING_SIZE = 1000
+
+
+class FAISSKnowledgeBase(KnowledgeBaseController):
+    """
+    Class for handling knowledge base interaction with FAISS.
+    Collections are inner product indices over normalized embeddings, exact unless quantized, and are stored as "<name>.faiss" files.
+    """
+
+    def __init__(self, peristant_directory: str, metadata: dict = None, base_embedding_function: EmbeddingFunction = None, quantize: bool = False) -> None:
+        """
+        Initiation method.
+        :param peristant_directory: Persistant directory for FAISS data.
+        :param metadata: Embedding collection metadata. Defaults to None.
+        :param base_embedding_function: Embedding function for base collection. Defaults to T5 large.
+        :param quantize: Flag, declaring whether collections store 8 bit scalar quantized embeddings.
+            Quantized collections take a quarter of the memory. They are kept exact until they hold
+            QUANTIZATION_TRAINING_SIZE embeddings, on which the quantizer is then trained.
+            Quantized collections stay on the CPU. Defaults to False.
+        """
+        if not os.path.exists(peristant_directory):
+            os.makedirs(peristant_directory)
+        self.peristant_directory = peristant_directory
+        self.base_embedding_function = embedding_utility.get_shared_embeddings(
+            cfg.PATHS.INSTRUCT_XL_PATH
+        ) if base_embedding_function is None else base_embedding_function
+        self.use_gpu = faiss.get_num_gpus() > 0
+        self.quantize = quantize
+
+        self.databases = {}
+        self.embedding_functions = {}
+        self.base_faiss = self.get_or_create_collection("base")
+
+    # Override
+    def get_or_create_collection(self, name: str, metadata: dict = None, embedding_function: EmbeddingFunction = None) -> FAISS:
+        """
+        Method for retrieving or creating a collection.
+        :param name: Collection name.
+        :param metadata: Embedding collection metadata. Defaults to None.
+        :param embedding_function: Embedding function for the collection. Defaults to base embedding function.
+        :return: Database API.
+        """
+        if name not in self.databases:
+            embedding_function = self.base_embedding_function if embedding_function is None else embedding_function
+            self.embedding_functions[name] = embedding_function
+            if os.path.exists(os.path.join(self.peristant_directory, f"{name}.faiss")):
+                self.databases[name] = FAISS.load_local(
+                    self.peristant_directory, embedding_function, index_name=name)
+                self.databases[name]._normalize_L2 = True
+            else:
+                dimension = len(embedding_function.embed_query(name))
+                self.databases[name] = FAISS(
+                    embedding_function.embed_query,
+                    faiss.IndexFlatIP(dimension),
+                    InMemoryDocstore({}),
+                    {},
+                    normalize_L2=True
+                )
+            if self.use_gpu and not isinstance(self.databases[name].index, faiss.IndexScalarQuantizer):
+                # Scalar quantized indices can not be cloned to GPUs
+                self.databases[name].index = faiss.index_cpu_to_all_gpus(
+                    self.databases[name].index)
+        return self.databases[name]
+
+    # Override
+    def get_retriever(self, name: str, search_type: str = "similarity", search_kwargs: dict = None) -> VectorStoreRetriever:
+        """
+        Method for acquiring a retriever.
+        :param name: Collection to use.
+        :param search_type: The retriever's search type. Defaults to "similarity".
+        :param search_kwargs: The retrievery search keyword arguments.
+            Defaults to None in which case {"k": 4, "include_metadata": True} is used.
+        :return: Retriever instance.
+        """
+        db = self.databases.get(name, self.databases["base"])
+        search_kwargs = {"k": 4, "include_metadata": True} if search_kwargs is None else dict(
+            search_kwargs)
+        search_kwargs["k"] = min(search_kwargs["k"], db.index.ntotal)
+        return db.as_retriever(
+            search_type=search_type, search_kwargs=search_kwargs
+        )
+
+    # Override
+    def search_batch(self, name: str, queries: List[str], k: int = 4) -> List[List[Document]]:
+        """
+        Method for searching documents for multiple queries at once.
+        Queries are embedded as queries in one batch and matched with a single index search.
+        :param name: Collection to use.
+        :param queries: Queries to search documents for.
+        :param k: Maximum number of documents per query. Defaults to 4.
+        :return: List of the most similar documents per query in query order.
+        """
+        name = name if name in self.databases else "base"
+        db = self.databases[name]
+        k = min(k, db.index.ntotal)
+        if not queries or k < 1:
+            return [[] for _ in queries]
+        query_embeddings = np.asarray(
+            embedding_utility.embed_queries(self.embedding_functions[name], queries), dtype=np.float32)
+        faiss.normalize_L2(query_embeddings)
+        _, indices = db.index.search(query_embeddings, k)
+        return [[db.docstore.search(db.index_to_docstore_id[index]) for index in query_indices if index != -1]
+                for query_indices in indices]
+
+    # Override
+    def embed_documents(self, name: str, documents: List[Document], ids: List[str] = None) -> None:
+        """
+        Method for embedding documents.
+        :param name: Collection to use.
+        :param documents: Documents to embed.
+        :param ids: Custom IDs to add. Defaults to the hash of the document contents.
+            Documents with IDs, which are already stored in the collection, are not embedded again.
+        """
+        if ids is None:
+            ids = hash_texts_with_sha256(
+                [document.page_content for document in documents])
+        known_ids = self.databases[name].docstore._dict
+        new_documents = {}
+        for document_id, document in zip(ids, documents):
+            if document_id not in known_ids and document_id not in new_documents:
+                new_documents[document_id] = document
+        if new_documents:
+            db = self.databases[name]
+            # Embedding the batch at once avoids one query embedding call per document
+            texts = [
+                document.page_content for document in new_documents.values()]
+            embeddings = np.asarray(
+                self.embedding_functions[name].embed_documents(texts), dtype=np.float32)
+            faiss.normalize_L2(embeddings)
+            db.add_embeddings(list(zip(texts, embeddings.tolist())), metadatas=[
+                              document.metadata for document in new_documents.values()], ids=list(new_documents))
+            if self.quantize and not isinstance(db.index, faiss.IndexScalarQuantizer) and db.index.ntotal >= QUANTIZATION_TRAINING_SIZE:
+                self.quantize_collection(name)
+            self.persist(name)
+
+    def quantize_collection(self, name: str) -> None:
+        """
+        Method for converting a collection to an 8 bit scalar quantized index.
+        The quantizer derives its value ranges from the embeddings already stored in the collection.
+        :param name: Collection to convert.
+        """
+        db = self.databases[name]
+        index = faiss.index_gpu_to_cpu(db.index) if self.use_gpu else db.index
+        embeddings = index.reconstruct_n(0, index.ntotal)
+        quantized_index = faiss.IndexScalarQuantizer(
+            index.d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        quantized_index.train(embeddings)
+        # Positions are kept, so that the docstore mapping stays valid
+        quantized_index.add(embeddings)
+        db.index = quantized_index
+
+    def persist(self, name: str) -> None:
+        """
+        Method for persisting a collection.
+        :param name: Collection to persist.
+        """
+        db = self.databases[name]
+        index = db.index
+        if self.use_gpu and not isinstance(index, faiss.IndexScalarQuantizer):
+            # GPU indices have to be copied to CPU for serialization
+            db.index = faiss.index_gpu_to_cpu(index)
+        try:
+            db.save_local(self.peristant_directory, index_name=name)
+        finally:
+            db.index = index
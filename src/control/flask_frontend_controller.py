@@ -9,7 +9,9 @@
 import os
 import flask
 from typing import List
-from multiprocessing import Process
+from threading import Thread
+from werkzeug.serving import make_server
+from werkzeug.debug import DebuggedApplication
 from flask import Flask, render_template, request, url_for, redirect, flash
 from flask import session
 from flask.logging import default_handler
@@ -63,7 +65,8 @@ class FlaskFrontendController(object):
 
         self._fix_config()
 
-        self.process = Process(target=self._startup_app)
+        self.server = None
+        self.thread = Thread(target=self._startup_app, daemon=True)
 
     def _fix_config(self) -> None:
         """
@@ -157,23 +160,30 @@ class FlaskFrontendController(object):
         """
         Internal method for running app.
         :param port: Port to run app on.
-        :param debug: Debugging flag.
+        :param debug: Debugging flag. Enables the interactive debugger, but no reloader,
+            as the server runs in a stoppable background thread.
         """
         # WebUI(app=self.app, port=port, debug=debug).run()
-        self.app.run(debug=debug, port=port)
+        self.app.debug = debug
+        self.server = make_server("127.0.0.1", port, DebuggedApplication(
+            self.app, evalex=True) if debug else self.app, threaded=True)
+        self.server.serve_forever()
 
     def run_app(self) -> None:
         """
         Method for running app.
         """
-        self.process.start()
-        self.process.join()
+        self.thread.start()
+        self.thread.join()
 
     def stop_app(self) -> None:
         """
         Method for stopping app (and setting up a new instance for the case it is needed).
         @Taken from https://stackoverflow.com/questions/23554644/how-do-i-terminate-a-flask-app-thats-running-as-a-service and adjusted.
         """
-        self.process.terminate()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server = None
         self._setup_app()
         self._setup_common_routs()
+        self.thread = Thread(target=self._startup_app, daemon=True)
@@ -8,16 +8,35 @@
 """
 import os
 import copy
+import importlib.util
 from typing import Any, List, Tuple
-from langchain.llms import LlamaCpp
+from langchain.llms import LlamaCpp, HuggingFacePipeline
 from langchain.chains import RetrievalQA
 from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationalRetrievalChain
-from uuid import uuid4
+from threading import Thread
 from src.configuration import configuration as cfg
 from src.control.chroma_knowledgebase_controller import ChromaKnowledgeBase, EmbeddingFunction, Embeddings, Document
-from src.utility.bronze import json_utility
-from src.utility.silver import file_system_utility
+from src.model.knowledgebase_control.abstract_knowledgebase_controller import KnowledgeBaseController
+from src.utility.bronze import json_utility, uuid_utility
+from src.utility.silver import file_system_utility, embedding_utility
+
+
+# llama.cpp clamps the offloaded layers to the model's layer count
+ALL_GPU_LAYERS = 1000
+# Knowledgebase classes under their knowledgebase type
+KNOWLEDGEBASE_TYPES = {
+    "chromadb": ChromaKnowledgeBase
+}
+
+
+def register_knowledgebase_type(kb_type: str, kb_class: type) -> None:
+    """
+    Function for registering a knowledgebase class.
+    :param kb_type: Knowledgebase type to register the class under.
+    :param kb_class: Knowledgebase class, implementing KnowledgeBaseController.
+    """
+    KNOWLEDGEBASE_TYPES[kb_type] = kb_class
 
 
 class TutorController(object):
@@ -34,11 +53,19 @@ class TutorController(object):
         self.config = {
             "conversations": {}
         } if config is None else config
-        self.llm = None if config is None else self.load_general_llm(
-            **config["llm"])
-        self.llm_type = None if config is None else config["llm"]["model_type"]
-        self.kb = None if config is None else self.load_knowledge_base(
-            **config["kb"])
+        # Loaders record their settings in the temporary config and therefore need it up-front
+        self.temporary_config = copy.deepcopy(self.config)
+        self.llm = None
+        self.llm_type = None
+        if config is not None:
+            self.load_general_llm(**config["llm"])
+        self._kb = None
+        self._kb_loader = None
+        self._kb_exception = None
+        # Kept across reinitialization by load_config, so that pending loads stay superseded
+        self._kb_generation = getattr(self, "_kb_generation", 0)
+        if config is not None:
+            self.load_knowledge_base(**config["kb"])
         self.doc_types = {
             "base": {"splitting": None}
         } if config is None else config["doc_types"]
@@ -47,7 +74,6 @@ class TutorController(object):
             for conversation in config["conversations"]:
                 self.start_conversation(
                     use_uuid=conversation, document_type=config["conversations"][conversation]["document_type"])
-        self.temporary_config = copy.deepcopy(self.config)
 
     def save_config(self, config_name: str) -> None:
         """
@@ -76,32 +102,180 @@ class TutorController(object):
         config = json_utility.load(path)
         self.__init__(config)
 
-    def load_general_llm(self, model_path: str, model_type: str = "llamacpp") -> None:
+    def load_general_llm(self, model_path: str, model_type: str = "llamacpp", use_mmap: bool = None, use_mlock: bool = None, n_gpu_layers: int = None, torch_dtype: str = None, quantization: str = "nf4") -> None:
         """
         Method for (re)loading main LLM.
-        :param model_path: Model path.
-        :param model_type: Model type frmo 'llamacpp', 'chat', 'instruct'. Defaults to 'llamacpp'.
+        :param model_path: Model path. If a folder is given, the GGUF file matching the "MODEL_QUANT" configuration is loaded.
+        :param model_type: Model type frmo 'llamacpp', 'transformers', 'chat', 'instruct'. Defaults to 'llamacpp'.
+        :param use_mmap: Flag for declaring whether to memory-map model weights instead of reading them into RAM up-front.
+            Defaults to None in which case the "LLAMACPP_USE_MMAP" configuration is used,
+            unless all layers are explicitly offloaded to the GPU via argument or "LLAMACPP_N_GPU_LAYERS".
+        :param use_mlock: Flag for declaring whether to pin model weights into RAM.
+            Defaults to None in which case the "LLAMACPP_USE_MLOCK" configuration is used.
+        :param n_gpu_layers: Number of llama.cpp layers to offload to the GPU.
+            Defaults to None in which case the "LLAMACPP_N_GPU_LAYERS" configuration is used, if set,
+            else all layers are offloaded if a GPU is available.
+        :param torch_dtype: Name of the torch data type to load transformers weights in.
+            Defaults to None in which case "float16" is used with CUDA, else "float32".
+        :param quantization: Quantization of transformers weights from 'nf4', 'int8' or None. Defaults to 'nf4'.
         """
         self.temporary_config["llm"] = {
             "model_path": model_path, "model_type": model_type}
+        self.llm_type = model_type
+        if model_type == "transformers":
+            self.temporary_config["llm"].update(
+                {"torch_dtype": torch_dtype, "quantization": quantization})
         if model_type == "llamacpp":
+            if os.path.isdir(model_path):
+                model_path = self.get_quantized_model_file(model_path)
+            if n_gpu_layers is None:
+                n_gpu_layers = cfg.LLAMACPP_N_GPU_LAYERS
+            # Auto-detected offloading may fall back to the CPU and therefore keeps memory-mapping
+            explicit_gpu_layers = n_gpu_layers is not None
+            if n_gpu_layers is None:
+                n_gpu_layers = self.get_gpu_layer_count()
+            if use_mmap is None:
+                use_mmap = cfg.LLAMACPP_USE_MMAP and not (
+                    explicit_gpu_layers and n_gpu_layers >= ALL_GPU_LAYERS)
             self.llm = LlamaCpp(
                 model_path=model_path,
                 verbose=True,
-                n_ctx=2048)
+                n_ctx=2048,
+                n_threads=os.cpu_count(),
+                n_batch=512,
+                n_gpu_layers=n_gpu_layers,
+                use_mmap=use_mmap,
+                use_mlock=cfg.LLAMACPP_USE_MLOCK if use_mlock is None else use_mlock)
+        elif model_type == "transformers":
+            self.llm = self.load_transformers_llm(
+                model_path, quantization=quantization, torch_dtype=torch_dtype)
+
+    def load_transformers_llm(self, model_path: str, quantization: str = "nf4", torch_dtype: str = None) -> HuggingFacePipeline:
+        """
+        Method for loading a Huggingface transformers LLM.
+        Weights are quantized at load time, if CUDA and bitsandbytes are available.
+        :param model_path: Model folder path.
+        :param quantization: Quantization from 'nf4', 'int8' or None. Defaults to 'nf4'.
+        :param torch_dtype: Name of the torch data type to load weights in and compute 4 bit layers with.
+            Defaults to None in which case "float16" is used with CUDA, else "float32", as half precision CPU kernels are slow or missing.
+            Loading directly in half precision avoids materializing a float32 copy and roughly halves peak RAM.
+        :return: LLM pipeline.
+        """
+        import torch
+        from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, pipeline
+
+        # Lift embedding thread limits, a knowledgebase might have set before
+        embedding_utility.reset_torch_threads()
+
+        if torch_dtype is None:
+            torch_dtype = "float16" if torch.cuda.is_available() else "float32"
+        model_kwargs = {"device_map": "auto",
+                        "torch_dtype": getattr(torch, torch_dtype)}
+        if quantization is not None and torch.cuda.is_available() and importlib.util.find_spec("bitsandbytes") is not None:
+            if quantization == "nf4":
+                model_kwargs["quantization_config"] = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_use_double_quant=True,
+                    bnb_4bit_compute_dtype=getattr(torch, torch_dtype))
+            elif quantization == "int8":
+                model_kwargs["quantization_config"] = BitsAndBytesConfig(
+                    load_in_8bit=True)
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path, local_files_only=True)
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path, local_files_only=True, **model_kwargs)
+        return HuggingFacePipeline(pipeline=pipeline(
+            "text-generation", model=model, tokenizer=tokenizer, max_new_tokens=256))
+
+    def get_gpu_layer_count(self) -> int:
+        """
+        Method for determining the number of llama.cpp layers to offload to the GPU.
+        :return: All layers, if a CUDA or Metal device is available, else 0.
+        """
+        if importlib.util.find_spec("torch") is not None:
+            import torch
+            if torch.cuda.is_available() or (hasattr(torch.backends, "mps") and torch.backends.mps.is_available()):
+                return ALL_GPU_LAYERS
+        return 0
+
+    def get_quantized_model_file(self, model_folder: str, quantization: str = None) -> str:
+        """
+        Method for retrieving the GGUF file of a given quantization from a model folder.
+        :param model_folder: Model folder.
+        :param quantization: Quantization tag, e.g. "Q4_K_M".
+            Defaults to None in which case the "MODEL_QUANT" configuration is used.
+        :return: Model file path.
+        """
+        suffix = f"{cfg.MODEL_QUANT if quantization is None else quantization}.gguf".lower()
+        for file in sorted(os.listdir(model_folder)):
+            if file.lower().endswith(suffix):
+                return os.path.join(model_folder, file)
+        raise FileNotFoundError(
+            f"No '{suffix}' model file found in '{model_folder}'.")
 
-    def load_knowledge_base(self, kb_path: str, kb_base_embedding_function: EmbeddingFunction = None) -> None:
+    def load_knowledge_base(self, kb_path: str, kb_base_embedding_function: EmbeddingFunction = None, kb_type: str = "chromadb", kb_quantize: bool = False) -> None:
         """
         Method for loading knowledgebase.
         :param kb_path: Folder path to knowledgebase.
         :param kb_base_embedding_function: Base embedding function to use for knowledgebase. 
             Defaults to None in which case the knowledgebase default is used.
+        :param kb_type: Knowledgebase type out of KNOWLEDGEBASE_TYPES or "faiss". Defaults to "chromadb".
+        :param kb_quantize: Flag, declaring whether new FAISS collections are scalar quantized. Defaults to False.
         """
         # TODO: Utilize configuration to instanciate embedding functions.
         self.temporary_config["kb"] = {
-            "kb_path": kb_path}
-        self.kb = ChromaKnowledgeBase(
-            peristant_directory=kb_path, base_embedding_function=kb_base_embedding_function)
+            "kb_path": kb_path,
+            "kb_type": kb_type,
+            "kb_quantize": kb_quantize}
+        # Loads started earlier are superseded and discard their results
+        self._kb_generation += 1
+        self._kb = None
+        self._kb_exception = None
+        self._kb_loader = Thread(target=self._warm_knowledge_base, args=(
+            self._kb_generation, kb_path, kb_base_embedding_function, kb_type, kb_quantize), daemon=True)
+        self._kb_loader.start()
+
+    def _warm_knowledge_base(self, generation: int, kb_path: str, kb_base_embedding_function: EmbeddingFunction = None, kb_type: str = "chromadb", kb_quantize: bool = False) -> None:
+        """
+        Internal method for loading the knowledgebase in the background.
+        :param generation: Load generation. Results are only kept, if no later load was started.
+        :param kb_path: Folder path to knowledgebase.
+        :param kb_base_embedding_function: Base embedding function to use for knowledgebase.
+        :param kb_type: Knowledgebase type out of KNOWLEDGEBASE_TYPES or "faiss". Defaults to "chromadb".
+        :param kb_quantize: Flag, declaring whether new FAISS collections are scalar quantized. Defaults to False.
+        """
+        try:
+            if self.llm_type != "transformers":
+                # Torch thread pools are process-global and would throttle a transformers LLM as well
+                embedding_utility.set_torch_threads(
+                    cfg.EMBEDDING_THREADS, cfg.EMBEDDING_INTEROP_THREADS)
+            if kb_type == "faiss" and kb_type not in KNOWLEDGEBASE_TYPES:
+                # Imported lazily to keep FAISS an optional dependency
+                from src.control.faiss_knowledgebase_controller import FAISSKnowledgeBase
+                register_knowledgebase_type(kb_type, FAISSKnowledgeBase)
+            kb_kwargs = {"quantize": kb_quantize} if kb_type == "faiss" else {}
+            kb = KNOWLEDGEBASE_TYPES[kb_type](
+                peristant_directory=kb_path, base_embedding_function=kb_base_embedding_function, **kb_kwargs)
+            if generation == self._kb_generation:
+                self._kb = kb
+        except Exception as ex:
+            if generation == self._kb_generation:
+                self._kb_exception = ex
+
+    @property
+    def kb(self) -> KnowledgeBaseController:
+        """
+        Knowledgebase getter, waiting for a pending background load to finish.
+        A failed load is re-raised on every access until a new load is started.
+        :return: Knowledgebase, if loaded.
+        """
+        loader = self._kb_loader
+        if loader is not None:
+            loader.join()
+        if self._kb_exception is not None:
+            raise self._kb_exception
+        return self._kb
 
     def register_document_type(self, document_type: str, embedding_function: EmbeddingFunction = None, splitting: Tuple[int] = None) -> None:
         """
@@ -131,7 +305,18 @@ class TutorController(object):
         """
         document_type = "base" if document_type is None else document_type
         self.kb.load_files(file_paths, document_type, self.doc_types.get(
-            document_type, {}).get("splitting"))
+            document_type, {}).get("splitting"), cfg.DOCUMENT_LOADING_WORKERS, cfg.DOCUMENT_LOADING_PROCESSES)
+
+    def retrieve_documents(self, queries: List[str], document_type: str = None, k: int = 4) -> List[List[Document]]:
+        """
+        Method for retrieving documents for multiple queries at once.
+        :param queries: Queries to retrieve documents for.
+        :param document_type: Target document type. Defaults to None in which case "base" is set.
+        :param k: Maximum number of documents per query. Defaults to 4.
+        :return: List of the most similar documents per query in query order.
+        """
+        return self.kb.search_batch(
+            "base" if document_type is None else document_type, queries, k)
 
     def start_conversation(self, use_uuid: str = None, document_type: str = None) -> str:
         """
@@ -140,7 +325,7 @@ class TutorController(object):
         :param document_type: Target document type. Defaults to None in which case "base" is set.
         :return: Conversation UUID.
         """
-        use_uuid = str(uuid4()) if use_uuid is None else use_uuid
+        use_uuid = uuid_utility.get_uuid() if use_uuid is None else use_uuid
         document_type = "base" if document_type is None else document_type
         self.temporary_config["conversations"][use_uuid] = {
             "document_type": document_type
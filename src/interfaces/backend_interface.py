@@ -598,8 +598,7 @@ def run_backend(host: str = None, port: int = None, reload: bool = True) -> None
     """
     uvicorn.run("src.interfaces.backend_interface:BACKEND",
                 host="127.0.0.1" if host is None else host,
-                port=int(
-                    cfg.ENV.get("BACKEND_PORT", 7861) if port is None else port),
+                port=cfg.BACKEND_PORT if port is None else port,
                 reload=True)
 
 
@@ -23,7 +23,7 @@ def start_controller_if_stopped() -> None:
     resp = handle_request("get", "/")
     if resp["message"] == "System is stopped":
         resp = handle_request("post", "/start")
-        cfg.LOGGER.info(f"[Streamlit] Controller started: {resp}")
+        cfg.LOGGER.info("[Streamlit] Controller started: %s", resp)
 
 
 def handle_user_question(question: str) -> str:
@@ -15,12 +15,12 @@ from src.utility.bronze import sqlalchemy_utility
 CONTROLLER = {
     "__tablename__": "controller",
     "__table_args__": {"comment": "Controller Table."},
-    "uuid": Column(String, primary_key=True, unique=True, nullable=False,
+    "uuid": Column(sqlalchemy_utility.UUIDBinary, primary_key=True, unique=True, nullable=False,
                    comment="UUID of the controller."),
-    "language_model_uuid": Column(String, ForeignKey(f"model.uuid"),
+    "language_model_uuid": Column(sqlalchemy_utility.UUIDBinary, ForeignKey(f"model.uuid"),
                                   comment="Registered language model to use."),
 
-    "knowledgebase_uuid": Column(String, ForeignKey(f"knowledgebase.uuid"),
+    "knowledgebase_uuid": Column(sqlalchemy_utility.UUIDBinary, ForeignKey(f"knowledgebase.uuid"),
                                  comment="Registered knowledgebase to use.")
 }
 
@@ -28,7 +28,7 @@ CONTROLLER = {
 MODEL = {
     "__tablename__": "model",
     "__table_args__": {"comment": "Model Table."},
-    "uuid": Column(String, primary_key=True, unique=True, nullable=False,
+    "uuid": Column(sqlalchemy_utility.UUIDBinary, primary_key=True, unique=True, nullable=False,
                    comment="UUID of the model."),
     "path": Column(String, nullable=False,
                    comment="Path of the model."),
@@ -42,13 +42,13 @@ MODEL = {
 KNOWLEDGEBASE = {
     "__tablename__": "knowledgebase",
     "__table_args__": {"comment": "Knowledgebase Table."},
-    "uuid": Column(String, primary_key=True, unique=True, nullable=False,
+    "uuid": Column(sqlalchemy_utility.UUIDBinary, primary_key=True, unique=True, nullable=False,
                    comment="UUID of the knowledgebase."),
     "path": Column(String, nullable=False,
                    comment="Path to the knowledgebase."),
     "loader": Column(String, nullable=False,
                      comment="Loader for knowledgebase."),
-    "embedding_model_uuid": Column(String, ForeignKey(f"model.uuid"),
+    "embedding_model_uuid": Column(sqlalchemy_utility.UUIDBinary, ForeignKey(f"model.uuid"),
                                    comment="Registered embedding model to use."),
     "documents": relationship("Document")
 
@@ -58,7 +58,7 @@ KNOWLEDGEBASE = {
 DOCUMENT = {
     "__tablename__": "document",
     "__table_args__": {"comment": "Document Table."},
-    "uuid": Column(String, primary_key=True, unique=True, nullable=False,
+    "uuid": Column(sqlalchemy_utility.UUIDBinary, primary_key=True, unique=True, nullable=False,
                    comment="UUID of the document."),
     "content": Column(BLOB, comment="Content of the document."),
     "meta_data": Column(JSON, comment="Metadata of the document.")
@@ -68,9 +68,9 @@ DOCUMENT = {
 CONVERSATION = {
     "__tablename__": "conversation",
     "__table_args__": {"comment": "Conversation Table."},
-    "uuid": Column(String, primary_key=True, unique=True, nullable=False,
+    "uuid": Column(sqlalchemy_utility.UUIDBinary, primary_key=True, unique=True, nullable=False,
                    comment="UUID of the conversation."),
-    "controller_uuid": Column(String, ForeignKey(f"model.uuid"),
+    "controller_uuid": Column(sqlalchemy_utility.UUIDBinary, ForeignKey(f"model.uuid"),
                               comment="UUID of managing controller."),
     "conversation_content": Column(JSON, comment="Conversation content.")
 
@@ -83,7 +83,16 @@ def create_or_load_database(database_uri: str) -> dict:
     :param database_uri: Database URI.
     """
     base = automap_base()
-    engine = sqlalchemy_utility.get_engine(database_uri)
+    sqlalchemy_utility.register_uuid_reflection(base.metadata)
+    # In-memory SQLite databases are bound to a single connection pool without overflow
+    engine_kwargs = {} if database_uri in ["sqlite://", "sqlite:///:memory:"] else {
+        "pool_size": 8, "max_overflow": 16}
+    if database_uri.startswith("sqlite"):
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+    engine = sqlalchemy_utility.get_engine(
+        database_uri, pool_pre_ping=True, **engine_kwargs)
+    if database_uri.startswith("sqlite"):
+        sqlalchemy_utility.set_sqlite_pragmas(engine)
     base.prepare(autoload_with=engine, reflect=True)
     model = {
         table: base.classes[classname_for_table(base, table, base.metadata.tables[table])] for table in
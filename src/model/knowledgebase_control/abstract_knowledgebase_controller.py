@@ -7,7 +7,10 @@
 """
 import os
 import abc
-from typing import Any, List, Tuple
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, List, Tuple, Iterable, Iterator
 from chromadb.api.types import EmbeddingFunction, Embeddings, Documents
 from langchain.docstore.document import Document
 from langchain.vectorstores.base import VectorStoreRetriever
@@ -16,6 +19,37 @@ from tqdm import tqdm
 from src.utility.bronze import langchain_utility
 
 
+def iter_file_paths(folder: str) -> Iterator[str]:
+    """
+    Function for iterating over all file paths below a folder.
+    :param folder: Folder path.
+    :return: Iterator over file paths.
+    """
+    folders = [folder]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                else:
+                    yield entry.path
+
+
+@lru_cache(maxsize=16)
+def get_text_splitter(split: int, overlap: int) -> RecursiveCharacterTextSplitter:
+    """
+    Function for acquiring a text splitter.
+    Splitters are reused for the same chunk size and overlap.
+    :param split: Chunk size to split documents into.
+    :param overlap: Overlap for split chunks.
+    :return: Text splitter.
+    """
+    return RecursiveCharacterTextSplitter(
+        chunk_size=split,
+        chunk_overlap=overlap,
+        length_function=len)
+
+
 def reload_document(document_path: str) -> Document:
     """
     Function for (re)loading document content.
@@ -44,16 +78,28 @@ class KnowledgeBaseController(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def get_retriever(self, name: str, search_type: str = "similarity", search_kwargs: dict = {"k": 4, "include_metadata": True}) -> VectorStoreRetriever:
+    def get_retriever(self, name: str, search_type: str = "similarity", search_kwargs: dict = None) -> VectorStoreRetriever:
         """
         Method for acquiring a retriever.
         :param name: Collection to use.
         :param search_type: The retriever's search type. Defaults to "similarity".
-        :param search_kwargs: The retrievery search keyword arguments. Defaults to {"k": 4, "include_metadata": True}.
+        :param search_kwargs: The retrievery search keyword arguments.
+            Defaults to None in which case {"k": 4, "include_metadata": True} is used.
         :return: Retriever instance.
         """
         pass
 
+    @abc.abstractmethod
+    def search_batch(self, name: str, queries: List[str], k: int = 4) -> List[List[Document]]:
+        """
+        Method for searching documents for multiple queries at once.
+        :param name: Collection to use.
+        :param queries: Queries to search documents for.
+        :param k: Maximum number of documents per query. Defaults to 4.
+        :return: List of the most similar documents per query in query order.
+        """
+        pass
+
     @abc.abstractmethod
     def embed_documents(self, name: str, documents: List[Document], ids: List[str] = None) -> None:
         """
@@ -64,34 +110,63 @@ class KnowledgeBaseController(abc.ABC):
         """
         pass
 
-    def load_folder(self, folder: str, target_collection: str = "base", splitting: Tuple[int] = None) -> None:
+    def load_folder(self, folder: str, target_collection: str = "base", splitting: Tuple[int] = None, num_workers: int = None, use_processes: bool = False) -> None:
         """
         Method for (re)loading folder contents.
         :param folder: Folder path.
         :param target_collection: Collection to handle folder contents. Defaults to "base".
         :param splitting: A tuple of chunk size and overlap for splitting. Defaults to None in which case the documents are not split.
+        :param num_workers: Number of workers for loading documents. Defaults to None in which case a default depending on the worker type is used.
+        :param use_processes: Flag, declaring whether to load documents in worker processes instead of threads. Defaults to False.
         """
-        file_paths = []
-        for root, dirs, files in os.walk(folder, topdown=True):
-            file_paths.extend([os.path.join(root, file) for file in files])
+        self.load_files(iter_file_paths(folder), target_collection,
+                        splitting, num_workers, use_processes)
 
-        self.load_files(file_paths, target_collection, splitting)
-
-    def load_files(self, file_paths: List[str], target_collection: str = "base", splitting: Tuple[int] = None) -> None:
+    def load_files(self, file_paths: Iterable[str], target_collection: str = "base", splitting: Tuple[int] = None, num_workers: int = None, use_processes: bool = False) -> None:
         """
         Method for (re)loading file paths.
-        :param file_paths: List of file paths.
+        :param file_paths: Iterable of file paths. Generators are consumed while documents are already being loaded.
         :param target_collection: Collection to handle folder contents. Defaults to "base".
         :param splitting: A tuple of chunk size and overlap for splitting. Defaults to None in which case the documents are not split.
+        :param num_workers: Number of workers for loading documents. Defaults to None in which case a default depending on the worker type is used.
+        :param use_processes: Flag, declaring whether to load documents in worker processes instead of threads.
+            Processes pay off for CPU-bound pure Python loaders, threads for IO-bound loaders and parsers in C extensions.
+            Defaults to False.
         """
-        document_paths = [file for file in file_paths if any(file.lower().endswith(
-            supported_extension) for supported_extension in langchain_utility.DOCUMENT_LOADERS)]
+        supported_extensions = tuple(langchain_utility.DOCUMENT_LOADERS)
+        document_paths = (
+            file for file in file_paths if file.lower().endswith(supported_extensions))
+        if isinstance(file_paths, list):
+            document_paths = list(document_paths)
         documents = []
 
-        with tqdm(total=len(document_paths), desc="(Re)loading folder contents...", ncols=80) as progress_bar:
-            for index, document_path in enumerate(document_paths):
-                documents.append(reload_document(document_path))
-                progress_bar.update(index)
+        if isinstance(document_paths, list) and len(document_paths) < 4:
+            # Small batches are not worth spinning up workers
+            executor = None
+        elif use_processes:
+            # Forking while loader, persistence and server threads are alive can deadlock the workers
+            executor = ProcessPoolExecutor(max_workers=num_workers if num_workers is not None else max(
+                1, (os.cpu_count() or 1) - 1), mp_context=multiprocessing.get_context("spawn"))
+        else:
+            executor = ThreadPoolExecutor(max_workers=num_workers if num_workers is not None else min(
+                32, (os.cpu_count() or 1) * 4))
+
+        with tqdm(total=len(document_paths) if isinstance(document_paths, list) else None, desc="(Re)loading folder contents...", ncols=80) as progress_bar:
+            if executor is None:
+                loaded_documents = map(reload_document, document_paths)
+            elif use_processes:
+                loaded_documents = executor.map(
+                    reload_document, document_paths, chunksize=4)
+            else:
+                loaded_documents = executor.map(
+                    reload_document, document_paths)
+            try:
+                for document in loaded_documents:
+                    documents.append(document)
+                    progress_bar.update(1)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
 
         if splitting is not None:
             documents = self.split_documents(documents, *splitting)
@@ -106,7 +181,4 @@ class KnowledgeBaseController(abc.ABC):
         :param overlap: Overlap for split chunks.
         :return: Split documents.
         """
-        return RecursiveCharacterTextSplitter(
-            chunk_size=split,
-            chunk_overlap=overlap,
-            length_function=len).split_documents(documents)
+        return get_text_splitter(split, overlap).split_documents(documents)
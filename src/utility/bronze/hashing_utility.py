@@ -6,6 +6,12 @@
 ****************************************************
 """
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+
+
+# Total number of bytes, from which on texts are hashed in parallel
+PARALLEL_HASHING_THRESHOLD = 1 << 20
 
 
 def hash_with_sha256(file_path: str) -> str:
@@ -14,6 +20,10 @@ def hash_with_sha256(file_path: str) -> str:
     :param file_path: File path.
     :return: Hash.
     """
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+ hashes file objects without Python-level chunk handling
+        with open(file_path, 'rb', buffering=0) as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
     h  = hashlib.sha256()
     b  = bytearray(128*1024)
     mv = memoryview(b)
@@ -23,12 +33,28 @@ def hash_with_sha256(file_path: str) -> str:
     return h.hexdigest()
 
 
-def hash_text_with_sha256(text: str) -> str:
+def hash_text_with_sha256(text: Union[str, bytes]) -> str:
     """
     Function for hashing text with SHA256.
-    :param text: Text to hash.
+    :param text: Text to hash. Already UTF-8 encoded bytes are hashed without encoding them again.
     :return: Hash.
     """
-    h = hashlib.sha256()
-    h.update(bytes(text, "utf-8"))
-    return h.hexdigest()
\ No newline at end of file
+    return hashlib.sha256(text if isinstance(text, bytes) else text.encode("utf-8")).hexdigest()
+
+
+def hash_texts_with_sha256(texts: List[Union[str, bytes]], max_workers: int = None) -> List[str]:
+    """
+    Function for hashing multiple texts with SHA256.
+    Large batches are hashed by a thread pool, since hashlib releases the GIL while hashing larger buffers.
+    :param texts: Texts to hash. Already UTF-8 encoded bytes are hashed without encoding them again.
+    :param max_workers: Maximum number of hashing threads for large batches.
+        Defaults to None in which case the ThreadPoolExecutor default is used.
+    :return: Hashes in text order.
+    """
+    sha256 = hashlib.sha256
+    encoded_texts = [text if isinstance(text, bytes) else text.encode(
+        "utf-8") for text in texts]
+    if len(encoded_texts) > 1 and sum(map(len, encoded_texts)) >= PARALLEL_HASHING_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda encoded_text: sha256(encoded_text).hexdigest(), encoded_texts))
+    return [sha256(encoded_text).hexdigest() for encoded_text in encoded_texts]
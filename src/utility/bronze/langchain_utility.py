@@ -13,7 +13,7 @@ from chromadb.config import Settings
 from langchain.docstore.document import Document
 from pydantic import BaseModel
 from langchain.vectorstores import Chroma
-from src.utility.bronze.hashing_utility import hash_text_with_sha256
+from src.utility.bronze.hashing_utility import hash_texts_with_sha256
 
 
 def get_or_create_vectordb(db_type: str = "chromadb", db_kwargs: Optional[Any] = {}) -> Any:
@@ -67,8 +67,8 @@ def add_documents_to_chromadb(chroma_db: Chroma, documents: List[Document], docs
     :param collection_name: Name of collection to add documents to.
         Defaults to None in which case base collection is used.
     """
-    chroma_db.add_documents(documents=documents, ids=docs_ids if docs_ids is not None else [
-                            hash_text_with_sha256(document.page_content) for document in documents])
+    chroma_db.add_documents(documents=documents, ids=docs_ids if docs_ids is not None else hash_texts_with_sha256(
+                            [document.page_content for document in documents]))
 
 
 def add_texts_to_chromadb(chroma_db: Chroma, texts: List[str], texts_metadata: List[str] = None, texts_ids: List[str] = None, collection_name: str = None) -> None:
@@ -85,7 +85,7 @@ def add_texts_to_chromadb(chroma_db: Chroma, texts: List[str], texts_metadata: L
     """
     kwargs = {
         "texts": texts,
-        "ids": texts_ids if texts_ids is not None else [hash_text_with_sha256(text) for text in texts]
+        "ids": texts_ids if texts_ids is not None else hash_texts_with_sha256(texts)
     }
     if texts_metadata is not None:
         kwargs["metadatas"] = texts_metadata
@@ -6,19 +6,22 @@
 ****************************************************
 """
 import copy
+from uuid import UUID
 from sqlalchemy import Column, String, Boolean, Integer, JSON, Text, DateTime, CHAR, ForeignKey, Table, Float, BLOB, TEXT
 from sqlalchemy.orm import Session, relationship
+from sqlalchemy.types import TypeDecorator, LargeBinary
 from sqlalchemy import and_, or_, not_
 from sqlalchemy import create_engine
 from sqlalchemy.ext.automap import automap_base, classname_for_table
 from sqlalchemy.dialects.mysql import LONGTEXT
-from sqlalchemy import orm, inspect
+from sqlalchemy import orm, inspect, event
 from sqlalchemy.engine import create_engine, Engine
 from sqlalchemy.sql import text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.exc import ProgrammingError, OperationalError
 from typing import List, Union, Any, Optional
+from src.utility.bronze import uuid_utility
 
 
 # Supported dialects
@@ -38,22 +41,99 @@ SQLALCHEMY_TYPING_DICTIONARY = {
     "float_": Float,
     "float": Float,
 }
+# Default SQLite pragmas for write-ahead logging and larger in-memory caches
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,
+    "mmap_size": 268435456
+}
+
+
+class UUIDBinary(TypeDecorator):
+    """
+    Column type for storing UUIDs as 16 bytes while handling them as strings on the Python side.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[Union[str, UUID, bytes]], dialect: Any) -> Optional[bytes]:
+        """
+        Method for converting UUIDs to bytes before storing them.
+        :param value: UUID as string, UUID object or 16 bytes.
+        :param dialect: Database dialect.
+        :return: UUID bytes.
+        """
+        if value is None or isinstance(value, bytes):
+            return value
+        uuid_bytes = uuid_utility.parse_uuid(value)
+        if uuid_bytes is None:
+            raise ValueError(f"Malformed UUID: {value!r}")
+        return uuid_bytes
 
+    def process_result_value(self, value: Optional[bytes], dialect: Any) -> Optional[str]:
+        """
+        Method for converting stored UUID bytes to strings.
+        :param value: UUID bytes.
+        :param dialect: Database dialect.
+        :return: UUID string.
+        """
+        return None if value is None else uuid_utility.format_uuid(value)
 
-def get_engine(engine_url: str, pool_recycle: int = 280, encoding: str = "utf-8") -> Engine:
+
+def register_uuid_reflection(metadata: Any) -> None:
+    """
+    Function for reflecting binary UUID columns as UUIDBinary columns.
+    UUID columns are detected by the column name "uuid" or the suffix "_uuid".
+    :param metadata: Metadata to register reflection handler for.
+    """
+    @event.listens_for(metadata, "column_reflect")
+    def reflect_uuid_column(inspector: Any, table: Any, column_info: dict) -> None:
+        """
+        Column reflection event handler.
+        :param inspector: Database inspector.
+        :param table: Reflected table.
+        :param column_info: Reflected column information.
+        """
+        if (column_info["name"] == "uuid" or column_info["name"].endswith("_uuid")) and isinstance(column_info["type"], LargeBinary):
+            column_info["type"] = UUIDBinary()
+
+
+def get_engine(engine_url: str, pool_recycle: int = 280, encoding: str = "utf-8", **engine_kwargs: Optional[Any]) -> Engine:
     """
     Function for getting database engine.
     :param engine_url: URL to create engine for.
     :param pool_recycle: Parameter for preventing the reuse of connections that were stale for some time.
     :param encoding: Encoding string. Defaults to 'utf-8'.
+    :param engine_kwargs: Additional engine keyword arguments, e.g. connection pool settings.
     :return: Engine to given database.
     """
     try:
         # SQLAlchemy 1.4
-        return create_engine(engine_url, encoding=encoding, pool_recycle=pool_recycle)
+        return create_engine(engine_url, encoding=encoding, pool_recycle=pool_recycle, **engine_kwargs)
     except TypeError:
         # SQLAlchemy 2.0
-        return create_engine(engine_url, pool_recycle=pool_recycle)
+        return create_engine(engine_url, pool_recycle=pool_recycle, **engine_kwargs)
+
+
+def set_sqlite_pragmas(engine: Engine, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    """
+    Function for setting SQLite pragmas on every new connection of an engine.
+    :param engine: SQLite database engine.
+    :param pragmas: Pragma dictionary, mapping pragma names to values. Defaults to SQLITE_PRAGMAS.
+    """
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        """
+        Connection event handler for setting pragmas.
+        :param dbapi_connection: DBAPI connection.
+        :param connection_record: Connection pool record.
+        """
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}={pragmas[pragma]}")
+        cursor.close()
 
 
 def execute_command(engine: Engine, command: str) -> Optional[Any]:
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+****************************************************
+*                     Utility                      *
+*            (c) 2023 Alexander Hering             *
+****************************************************
+"""
+import os
+from threading import local
+from time import time_ns
+from typing import Any, Optional
+from uuid import UUID
+
+
+# Number of random UUIDs to draw from the OS per refill
+UUID_BUFFER_SIZE = 256
+_UUID_BUFFER = local()
+
+
+def _reset_uuid_buffer() -> None:
+    """
+    Function for discarding buffered random bytes.
+    Forked child processes would otherwise hand out the same UUIDs as their parent.
+    """
+    global _UUID_BUFFER
+    _UUID_BUFFER = local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_uuid_buffer)
+
+
+def get_random_bytes(length: int) -> bytes:
+    """
+    Function for drawing random bytes from a thread-local buffer.
+    The buffer is refilled from a single os.urandom call once exhausted.
+    :param length: Number of bytes. Must not exceed the buffer size of 16 * UUID_BUFFER_SIZE bytes.
+    :return: Random bytes.
+    """
+    buffer = getattr(_UUID_BUFFER, "buffer", b"")
+    offset = getattr(_UUID_BUFFER, "offset", 0)
+    if offset + length > len(buffer):
+        buffer = os.urandom(16 * UUID_BUFFER_SIZE)
+        offset = 0
+        _UUID_BUFFER.buffer = buffer
+    _UUID_BUFFER.offset = offset + length
+    return buffer[offset:offset + length]
+
+
+def format_uuid(uuid_bytes: bytes) -> str:
+    """
+    Function for formatting 16 UUID bytes as hyphenated hex string.
+    :param uuid_bytes: UUID bytes.
+    :return: UUID string.
+    """
+    hex_string = uuid_bytes.hex()
+    return f"{hex_string[:8]}-{hex_string[8:12]}-{hex_string[12:16]}-{hex_string[16:20]}-{hex_string[20:]}"
+
+
+
+def parse_uuid(value: Any) -> Optional[bytes]:
+    """
+    Function for converting a UUID in any common notation to its 16 bytes.
+    Hex strings with or without hyphens are converted directly, other notations are left to UUID parsing.
+    :param value: UUID as string, UUID object or 16 bytes.
+    :return: UUID bytes, if the value is a well-formed UUID, else None.
+    """
+    if isinstance(value, bytes):
+        return value if len(value) == 16 else None
+    if isinstance(value, UUID):
+        return value.bytes
+    if not isinstance(value, str):
+        return None
+    try:
+        uuid_bytes = bytes.fromhex(value.replace("-", ""))
+        if len(uuid_bytes) == 16:
+            return uuid_bytes
+    except ValueError:
+        pass
+    try:
+        return UUID(value).bytes
+    except ValueError:
+        return None
+
+def get_uuid() -> str:
+    """
+    Function for generating a random (version 4) UUID string.
+    :return: UUID string.
+    """
+    uuid_bytes = bytearray(get_random_bytes(16))
+    uuid_bytes[6] = (uuid_bytes[6] & 0x0F) | 0x40
+    uuid_bytes[8] = (uuid_bytes[8] & 0x3F) | 0x80
+    return format_uuid(uuid_bytes)
+
+
+def get_time_ordered_uuid() -> str:
+    """
+    Function for generating a time-ordered (version 7) UUID string.
+    UUIDs generated in a later millisecond sort after earlier ones, which keeps primary key inserts near the tail of B-tree indices.
+    UUIDs generated within the same millisecond are ordered randomly.
+    :return: UUID string.
+    """
+    timestamp = (time_ns() // 1_000_000) & 0xFFFFFFFFFFFF
+    uuid_bytes = bytearray(timestamp.to_bytes(6, "big") + get_random_bytes(10))
+    uuid_bytes[6] = (uuid_bytes[6] & 0x0F) | 0x70
+    uuid_bytes[8] = (uuid_bytes[8] & 0x3F) | 0x80
+    return format_uuid(uuid_bytes)
@@ -7,7 +7,7 @@
 """
 # In-depth documentation can be found under utility/docs/entity_data_interfaces.md
 import copy
-from sqlalchemy import and_, or_, not_
+from sqlalchemy import and_, or_, not_, select, bindparam
 from typing import Optional, Any, List, Union
 from ..bronze import sqlalchemy_utility
 from .filter_mask import FilterMask
@@ -30,6 +30,8 @@ SQLALCHEMY_FILTER_CONVERTER = {
     "in": lambda x, y: x.in_(y),
     "not_in": lambda x, y: not_(x.in_(y))
 }
+# Filter types, which compare against a list of values
+EXPANDING_FILTER_TYPES = ["is_contained", "not_is_contained", "in", "not_in"]
 
 # Dictionary, defining table for manual linking
 MANUAL_LINKAGE = {
@@ -77,6 +79,7 @@ class SQLAlchemyEntityInterface(EntityDataInterface):
         self.base = sqlalchemy_utility.get_automapped_base(self.engine)
         self.model = sqlalchemy_utility.get_classes_from_base(self.base)
         self.session_factory = None
+        self._filter_statements = {}
 
     """
     Initiation methods
@@ -144,10 +147,53 @@ class SQLAlchemyEntityInterface(EntityDataInterface):
         :return: Filter expressions.
         """
         filter_expressions = []
+        entity_class = self.model[entity_type]
+        filter_converter = SQLALCHEMY_FILTER_CONVERTER
         for filtermask in filters:
             filter_expressions.extend([
-                SQLALCHEMY_FILTER_CONVERTER[exp[1]](getattr(self.model[entity_type], exp[0]),
-                                                    exp[2]) for exp in filtermask.expressions])
+                filter_converter[exp[1]](getattr(entity_class, exp[0]),
+                                         exp[2]) for exp in filtermask.expressions])
+        return filter_expressions
+
+    def get_filter_statement(self, entity_type: str, filter_shape: tuple) -> Any:
+        """
+        Method for acquiring a parameterized select statement for a filter shape.
+        Statements are built once per entity type and filter shape and reused with new parameter values.
+        :param entity_type: Entity type.
+        :param filter_shape: Tuple of (key, filter type, value is None) tuples. Value parameters are named "p[index]".
+        :return: Select statement.
+        """
+        if (entity_type, filter_shape) not in self._filter_statements:
+            entity_class = self.model[entity_type]
+            self._filter_statements[(entity_type, filter_shape)] = select(entity_class).where(*[
+                SQLALCHEMY_FILTER_CONVERTER[filter_type](getattr(entity_class, key), None if value_is_none else bindparam(
+                    f"p{index}", expanding=filter_type in EXPANDING_FILTER_TYPES))
+                for index, (key, filter_type, value_is_none) in enumerate(filter_shape)]).limit(1)
+        return self._filter_statements[(entity_type, filter_shape)]
+
+    def convert_filters_to_disjunction(self, entity_type: str, filters: List[FilterMask]) -> list:
+        """
+        Method for coverting common FilterMasks to SQLAlchemy-filter expressions, which are combined disjunctively.
+        Equality expressions on the same column are merged into a single IN-expression.
+        :param entity_type: Entity type.
+        :param filters: A list of Filtermasks declaring constraints.
+        :return: Filter expressions.
+        """
+        filter_expressions = []
+        equality_values = {}
+        entity_class = self.model[entity_type]
+        filter_converter = SQLALCHEMY_FILTER_CONVERTER
+        for filtermask in filters:
+            for exp in filtermask.expressions:
+                if exp[1] in ["==", "equals"] and exp[2] is not None:
+                    equality_values.setdefault(exp[0], []).append(exp[2])
+                else:
+                    filter_expressions.append(filter_converter[exp[1]](
+                        getattr(entity_class, exp[0]), exp[2]))
+        for key in equality_values:
+            column = getattr(entity_class, key)
+            filter_expressions.append(column == equality_values[key][0] if len(
+                equality_values[key]) == 1 else column.in_(equality_values[key]))
         return filter_expressions
 
     """
@@ -163,10 +209,13 @@ class SQLAlchemyEntityInterface(EntityDataInterface):
         :param kwargs: Arbitrary keyword arguments.
         :return: Target entity.
         """
+        expressions = [
+            exp for filtermask in filters for exp in filtermask.expressions]
+        statement = self.get_filter_statement(entity_type, tuple(
+            (exp[0], exp[1], exp[2] is None) for exp in expressions))
         with self.session_factory() as session:
-            result = session.query(self.model[entity_type]).filter(
-                *self.convert_filters(entity_type, filters)
-            ).first()
+            result = session.execute(statement, {
+                f"p{index}": exp[2] for index, exp in enumerate(expressions) if exp[2] is not None}).scalars().first()
         return result
 
     # override
@@ -179,8 +228,8 @@ class SQLAlchemyEntityInterface(EntityDataInterface):
         :param kwargs: Arbitrary keyword arguments.
         :return: Target entities.
         """
-        converted_filters = [
-            or_(*self.convert_filters(entity_type, filters)) for filters in list_of_filters]
+        converted_filters = self.convert_filters_to_disjunction(
+            entity_type, [filtermask for filters in list_of_filters for filtermask in filters])
         with self.session_factory() as session:
             result = session.query(self.model[entity_type]).filter(or_(
                 *converted_filters)
@@ -6,7 +6,10 @@
 ****************************************************
 """
 import os
+from threading import Lock
+from collections import OrderedDict
 from typing import Any, List, Tuple
+import torch
 import torch.nn.functional as F
 from torch import Tensor
 from chromadb.api.types import EmbeddingFunction, Documents
@@ -18,25 +21,60 @@ from sentence_transformers import SentenceTransformer
 from ..bronze import json_utility
 
 
+# Embeddings, shared across knowledgebases under their model path
+_SHARED_EMBEDDINGS = {}
+_SHARED_EMBEDDINGS_LOCK = Lock()
+# Torch intra-op thread count before it was first changed via set_torch_threads
+_DEFAULT_TORCH_THREADS = None
+
+
 class LocalHuggingFaceEmbeddings(LCEmbeddings):
     """
     Class for using local sentence transformer models from Huggingface as embeddings.
     """
 
-    def __init__(self, model_path: str) -> None:
+    def __init__(self, model_path: str, batch_size: int = 64, device: str = None, query_cache_size: int = 2048) -> None:
         """
         Initiation method.
         :param model_path: Model path.
+        :param batch_size: Number of texts to embed per forward pass. Defaults to 64.
+        :param device: Device to run the model on.
+            Defaults to None in which case CUDA is used with half precision, if available, else CPU.
+        :param query_cache_size: Number of query embeddings to keep for repeated queries. Defaults to 2048.
         """
-        try:
-            self.embedding_model = SentenceTransformer(model_path)
-        except TypeError as ex:
-            if str(ex) == "Pooling.__init__() got an unexpected keyword argument 'pooling_mode_weightedmean_tokens'":
-                print(
-                    "Encountered error (https://huggingface.co/hkunlp/instructor-base/discussions/6), adjusting local files.")
-                print(
-                    f"Try 'pip install --force --no-deps git+https://github.com/UKPLab/sentence-transformers.git'")
-                raise ex
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.device = device if device is not None else (
+            "cuda" if torch.cuda.is_available() else "cpu")
+        self._embedding_model = None
+        self._embedding_model_lock = Lock()
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = Lock()
+
+    @property
+    def embedding_model(self) -> SentenceTransformer:
+        """
+        Embedding model getter, loading the model on first access.
+        :return: Sentence transformer model.
+        """
+        if self._embedding_model is None:
+            with self._embedding_model_lock:
+                if self._embedding_model is None:
+                    try:
+                        embedding_model = SentenceTransformer(
+                            self.model_path, device=self.device)
+                    except TypeError as ex:
+                        if str(ex) == "Pooling.__init__() got an unexpected keyword argument 'pooling_mode_weightedmean_tokens'":
+                            print(
+                                "Encountered error (https://huggingface.co/hkunlp/instructor-base/discussions/6), adjusting local files.")
+                            print(
+                                f"Try 'pip install --force --no-deps git+https://github.com/UKPLab/sentence-transformers.git'")
+                        raise ex
+                    if self.device.startswith("cuda"):
+                        embedding_model.half()
+                    self._embedding_model = embedding_model
+        return self._embedding_model
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
@@ -44,7 +82,7 @@ class LocalHuggingFaceEmbeddings(LCEmbeddings):
         :param texts: Texts.
         :return: A list of embeddings for each text in the form of a list of floats.
         """
-        return [embedding.tolist() for embedding in self.embedding_model.encode(texts)]
+        return self.embedding_model.encode(texts, batch_size=self.batch_size).tolist()
 
     def embed_query(self, query: str) -> List[float]:
         """
@@ -52,7 +90,98 @@ class LocalHuggingFaceEmbeddings(LCEmbeddings):
         :param query: Query.
         :return: The embedding for the given queryin the form of a list of floats.
         """
-        return self.embedding_model.encode([query])[0].tolist()
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(query)
+            if embedding is not None:
+                self._query_cache.move_to_end(query)
+                return list(embedding)
+        embedding = self.embedding_model.encode([query])[0].tolist()
+        if self.query_cache_size > 0:
+            with self._query_cache_lock:
+                self._query_cache[query] = tuple(embedding)
+                if len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return embedding
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Method for embedding multiple queries at once.
+        Cached queries are served from the query cache, the remaining ones are embedded in batches.
+        :param queries: Queries.
+        :return: A list of embeddings for each query in the form of a list of floats.
+        """
+        embeddings = {}
+        with self._query_cache_lock:
+            for query in queries:
+                embedding = self._query_cache.get(query)
+                if embedding is not None:
+                    self._query_cache.move_to_end(query)
+                    embeddings[query] = embedding
+        missing_queries = list(dict.fromkeys(
+            query for query in queries if query not in embeddings))
+        if missing_queries:
+            missing_embeddings = self.embedding_model.encode(
+                missing_queries, batch_size=self.batch_size).tolist()
+            with self._query_cache_lock:
+                for query, embedding in zip(missing_queries, missing_embeddings):
+                    embeddings[query] = tuple(embedding)
+                    if self.query_cache_size > 0:
+                        self._query_cache[query] = embeddings[query]
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return [list(embeddings[query]) for query in queries]
+
+
+def set_torch_threads(num_threads: int, num_interop_threads: int = None) -> None:
+    """
+    Function for setting the process-wide torch thread pool sizes.
+    :param num_threads: Number of intra-op threads.
+    :param num_interop_threads: Number of inter-op threads. Defaults to None in which case it is not changed.
+    """
+    global _DEFAULT_TORCH_THREADS
+    if _DEFAULT_TORCH_THREADS is None:
+        _DEFAULT_TORCH_THREADS = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    if num_interop_threads is not None:
+        try:
+            torch.set_num_interop_threads(num_interop_threads)
+        except RuntimeError:
+            # The inter-op pool can only be sized once and before any parallel work was started
+            pass
+
+
+def reset_torch_threads() -> None:
+    """
+    Function for restoring the process-wide torch intra-op thread count from before set_torch_threads was first called.
+    The inter-op thread count can not be changed again and is kept.
+    """
+    if _DEFAULT_TORCH_THREADS is not None:
+        torch.set_num_threads(_DEFAULT_TORCH_THREADS)
+
+
+def embed_queries(embedding_function: Any, queries: List[str]) -> List[List[float]]:
+    """
+    Function for embedding multiple queries with query semantics.
+    :param embedding_function: Embedding function with an "embed_query" method.
+    :param queries: Queries.
+    :return: A list of embeddings for each query in the form of a list of floats.
+    """
+    if hasattr(embedding_function, "embed_queries"):
+        return embedding_function.embed_queries(queries)
+    return [embedding_function.embed_query(query) for query in queries]
+
+
+def get_shared_embeddings(model_path: str) -> LocalHuggingFaceEmbeddings:
+    """
+    Function for acquiring process-wide shared embeddings for a local model.
+    :param model_path: Model path.
+    :return: Embeddings instance, shared by all callers with the same model path.
+    """
+    with _SHARED_EMBEDDINGS_LOCK:
+        if model_path not in _SHARED_EMBEDDINGS:
+            _SHARED_EMBEDDINGS[model_path] = LocalHuggingFaceEmbeddings(
+                model_path)
+        return _SHARED_EMBEDDINGS[model_path]
 
 
 class T5EmbeddingFunction(EmbeddingFunction):
@@ -61,16 +190,23 @@ class T5EmbeddingFunction(EmbeddingFunction):
     (https://huggingface.co/intfloat/e5-large-v2)
     """
 
-    def __init__(self, model_path: str) -> None:
+    def __init__(self, model_path: str, batch_size: int = 64, device: str = None) -> None:
         """
         Initiation method.
         :param model_path: Model path.
+        :param batch_size: Number of texts to embed per forward pass. Defaults to 64.
+        :param device: Device to run the model on.
+            Defaults to None in which case CUDA is used, if available, else CPU.
         """
         super().__init__()
+        self.batch_size = batch_size
+        self.device = device if device is not None else (
+            "cuda" if torch.cuda.is_available() else "cpu")
         self.tokenizer = AutoTokenizer.from_pretrained(
             model_path, local_files_only=True)
         self.model = AutoModel.from_pretrained(
-            model_path, local_files_only=True)
+            model_path, local_files_only=True).to(self.device)
+        self.model.eval()
 
     def embed_documents(self, texts: Documents) -> CDBEmbeddings:
         """
@@ -78,17 +214,26 @@ class T5EmbeddingFunction(EmbeddingFunction):
         :param texts: Texts to embed.
         """
         # Taken from https://huggingface.co/intfloat/e5-large-v2 and adjusted
-        # Tokenize the input texts
-        batch_dict = self.tokenizer(texts, max_length=512,
-                                    padding=True, truncation=True, return_tensors='pt')
+        # Texts are batched by length to keep padding per batch low
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        embeddings = [None] * len(texts)
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch_indices = order[start:start + self.batch_size]
+                # Tokenize the input texts
+                batch_dict = self.tokenizer([texts[index] for index in batch_indices], max_length=512,
+                                            padding=True, truncation=True, return_tensors='pt').to(self.device)
 
-        outputs = self.model(**batch_dict)
-        embeddings = self.average_pool(outputs.last_hidden_state,
-                                       batch_dict['attention_mask'])
+                outputs = self.model(**batch_dict)
+                batch_embeddings = self.average_pool(outputs.last_hidden_state,
+                                                     batch_dict['attention_mask'])
 
-        # normalize embeddings
-        embeddings = F.normalize(embeddings, p=2, dim=1)
-        return embeddings.tolist()
+                # normalize embeddings
+                batch_embeddings = F.normalize(
+                    batch_embeddings, p=2, dim=1).tolist()
+                for index, embedding in zip(batch_indices, batch_embeddings):
+                    embeddings[index] = embedding
+        return embeddings
 
     def embed_query(self, query: str) -> CDBEmbeddings:
         """
@@ -97,14 +242,15 @@ class T5EmbeddingFunction(EmbeddingFunction):
         :return: Query embedding.
         """
         batch_dict = self.tokenizer(query, max_length=512,
-                                    padding=True, truncation=True, return_tensors='pt')
+                                    padding=True, truncation=True, return_tensors='pt').to(self.device)
 
-        outputs = self.model(**batch_dict)
-        embeddings = self.average_pool(outputs.last_hidden_state,
-                                       batch_dict['attention_mask'])
+        with torch.inference_mode():
+            outputs = self.model(**batch_dict)
+            embeddings = self.average_pool(outputs.last_hidden_state,
+                                           batch_dict['attention_mask'])
 
-        # normalize embeddings
-        embeddings = F.normalize(embeddings, p=2, dim=1)
+            # normalize embeddings
+            embeddings = F.normalize(embeddings, p=2, dim=1)
         return embeddings.tolist()
 
     def average_pool(self, last_hidden_states: Tensor, attention_mask: Tensor) -> Tensor:
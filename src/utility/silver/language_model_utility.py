@@ -5,7 +5,7 @@
 *            (c) 2023 Alexander Hering             *
 ****************************************************
 """
-from typing import Any
+from typing import Any, List
 from abc import ABC, abstractmethod
 
 
@@ -23,6 +23,15 @@ class LanguageModel(ABC):
         """
         pass
 
+    def handle_query_batch(self, queries: List[str]) -> List[Any]:
+        """
+        Handler method for a batch of queries.
+        Should be overwritten by language models which support batched inference.
+        :param queries: User queries.
+        :return: Responses in query order.
+        """
+        return [self.handle_query(query) for query in queries]
+
 
 def spawn_language_model_instance(config: str) -> LanguageModel:
     """